@@ -4,232 +4,448 @@ Uses sophisticated NLP and pattern matching for intelligent document classificat
 """
 
 import re
-import json
-from typing import Dict, List, Tuple, Optional
+import functools
+from bisect import bisect_right
+from collections import OrderedDict, defaultdict, deque
+from enum import IntEnum
+from typing import Any, Dict, Iterator, List, Tuple, Optional
 
-class DocumentAnalyzer:
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+class ExamType(IntEnum):
+    JEE = 0
+    NEET = 1
+    UPSC = 2
+    GATE = 3
+    CAT = 4
+
+# Exam identifiers accepted at the API boundary, mapped to ExamType values
+_EXAM_TO_INT = {exam.name.lower(): exam.value for exam in ExamType}
+
+# Characters that make a pattern more than a plain literal
+_REGEX_METACHARS = frozenset('.^$*+?{}[]\\|()')
+
+# Joins filenames for batch keyword sweeps; no keyword contains it, so matches never span two names
+_FILENAME_SEPARATOR = '\x01'
+
+# Lowercase letters that re.IGNORECASE still treats as 's' and 'i'
+_IGNORECASE_EXTRAS = str.maketrans({'\u017f': 's', '\u0131': 'i'})
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton matching every registered keyword in one pass
+    """
     def __init__(self):
-        # Enhanced document patterns with exam-specific mappings
-        self.document_patterns = {
-            'photograph': {
-                'keywords': [
-                    'photo', 'photograph', 'image', 'picture', 'pic',
-                    'passport size', 'headshot', 'passport photo', 'passport photograph'
-                ],
-                'patterns': [
-                    r'photo(?:graph)?',
-                    r'image',
-                    r'picture',
-                    r'passport\s*(?:size|photo)',
-                    r'headshot',
-                    r'postcard\s*photo'
-                ],
-                'exam_mappings': {
-                    'jee': 'photograph',
-                    'neet': 'passport_photograph',
-                    'upsc': 'photograph',
-                    'gate': 'photograph',
-                    'cat': 'photograph'
-                }
-            },
-            'postcard_photograph': {
-                'keywords': [
-                    'postcard photo', 'postcard photograph', 'postcard size photo'
-                ],
-                'patterns': [
-                    r'postcard\s*(?:photo|photograph)',
-                    r'postcard\s*size'
-                ],
-                'exam_mappings': {
-                    'neet': 'postcard_photograph'
-                }
-            },
-            'signature': {
-                'keywords': [
-                    'signature', 'sign', 'autograph', 'signed', 'sig'
-                ],
-                'patterns': [
-                    r'signature',
-                    r'sign(?:ed)?',
-                    r'autograph',
-                    r'\bsig\b'
-                ],
-                'exam_mappings': {
-                    'jee': 'signature',
-                    'neet': 'signature',
-                    'upsc': 'signature',
-                    'gate': 'signature',
-                    'cat': 'signature'
-                }
-            },
-            'class10_certificate': {
-                'keywords': [
-                    'class 10', '10th', 'tenth', 'x class', 'sslc', 'matriculation',
-                    'class10', 'class-10', '10 class'
-                ],
-                'patterns': [
-                    r'class\s*10',
-                    r'10th?',
-                    r'tenth',
-                    r'x\s*class',
-                    r'sslc',
-                    r'matriculation'
-                ],
-                'exam_mappings': {
-                    'jee': 'class10_certificate',
-                    'neet': 'class10_certificate'
-                }
-            },
-            'category_certificate': {
-                'keywords': [
-                    'caste certificate', 'category certificate', 'reservation certificate',
-                    'obc', 'sc', 'st', 'ews', 'minority', 'pwd', 'disability'
-                ],
-                'patterns': [
-                    r'caste\s*certificate',
-                    r'category\s*certificate',
-                    r'reservation\s*certificate',
-                    r'obc|sc|st|ews',
-                    r'minority\s*certificate',
-                    r'pwd|disability'
-                ],
-                'exam_mappings': {
-                    'neet': 'category_certificate',
-                    'gate': 'category_certificate'
-                }
-            },
-            'caste_or_pwd_certificate': {
-                'keywords': [
-                    'caste certificate', 'pwd certificate', 'disability certificate',
-                    'reservation certificate', 'category certificate'
-                ],
-                'patterns': [
-                    r'caste\s*certificate',
-                    r'pwd\s*certificate',
-                    r'disability\s*certificate',
-                    r'reservation\s*certificate'
-                ],
-                'exam_mappings': {
-                    'jee': 'caste_or_pwd_certificate'
-                }
-            },
-            'finger_thumb_impressions': {
-                'keywords': [
-                    'finger impression', 'thumb impression', 'fingerprint',
-                    'thumb print', 'finger print'
-                ],
-                'patterns': [
-                    r'finger\s*(?:impression|print)',
-                    r'thumb\s*(?:impression|print)',
-                    r'fingerprint'
-                ],
-                'exam_mappings': {
-                    'neet': 'finger_thumb_impressions'
-                }
-            },
-            'address_proof': {
-                'keywords': [
-                    'address proof', 'address certificate', 'domicile',
-                    'residence proof', 'residential certificate'
-                ],
-                'patterns': [
-                    r'address\s*(?:proof|certificate)',
-                    r'domicile',
-                    r'residence\s*proof',
-                    r'residential\s*certificate'
-                ],
-                'exam_mappings': {
-                    'neet': 'address_proof'
-                }
-            },
-            'photo_id_proof': {
-                'keywords': [
-                    'photo id', 'identity proof', 'id proof', 'aadhar', 'aadhaar',
-                    'pan card', 'voter id', 'passport', 'driving license'
-                ],
-                'patterns': [
-                    r'photo\s*id',
-                    r'identity\s*proof',
-                    r'id\s*proof',
-                    r'aa?dh?aa?r',
-                    r'pan\s*card',
-                    r'voter\s*id',
-                    r'passport',
-                    r'driving\s*licen[cs]e'
-                ],
-                'exam_mappings': {
-                    'upsc': 'photo_id_proof'
-                }
-            },
-            'certificates_academic_or_category': {
-                'keywords': [
-                    'academic certificate', 'degree certificate', 'graduation certificate',
-                    'category certificate', 'educational certificate'
-                ],
-                'patterns': [
-                    r'academic\s*certificate',
-                    r'degree\s*certificate',
-                    r'graduation\s*certificate',
-                    r'educational\s*certificate'
-                ],
-                'exam_mappings': {
-                    'cat': 'certificates_academic_or_category'
-                }
-            }
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[Any]] = [[]]
+        self._delta: List[Dict[str, int]] = [{}]
+        self._first_chars: frozenset = frozenset()
+
+    def add_word(self, word: str, value: Any) -> None:
+        """
+        Register a keyword; a keyword added twice reports every value
+        """
+        state = 0
+        for char in word:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = next_state
+        self._outputs[state].append(value)
+
+    def make_automaton(self) -> None:
+        """
+        Build failure links once all keywords have been added, then fold them
+        into a transition table so matching never has to walk failure chains
+        """
+        self._first_chars = frozenset(self._goto[0])
+        order = []
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            order.append(state)
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+
+        # Breadth-first order guarantees a state's failure target is resolved before it
+        self._delta = [dict(self._goto[0])] + [{} for _ in range(len(self._goto) - 1)]
+        for state in order:
+            delta = dict(self._delta[self._fail[state]])
+            delta.update(self._goto[state])
+            self._delta[state] = delta
+
+    def iter(self, text: str) -> Iterator[Tuple[int, Any]]:
+        """
+        Yield (end_index, value) for every keyword occurrence in text
+        """
+        delta, outputs = self._delta, self._outputs
+        first_chars = self._first_chars
+        state = 0
+        for index, char in enumerate(text):
+            # From the root only characters that start some keyword can advance
+            if not state and char not in first_chars:
+                continue
+            # Characters outside the keyword alphabet fall back to the root
+            state = delta[state].get(char, 0)
+            for value in outputs[state]:
+                yield index, value
+
+# Enhanced document patterns with exam-specific mappings
+_DOCUMENT_PATTERNS = {
+    'photograph': {
+        'keywords': [
+            'photo', 'photograph', 'image', 'picture', 'pic',
+            'passport size', 'headshot', 'passport photo', 'passport photograph'
+        ],
+        'patterns': [
+            r'photo(?:graph)?',
+            r'image',
+            r'picture',
+            r'passport\s*(?:size|photo)',
+            r'headshot',
+            r'postcard\s*photo'
+        ],
+        'exam_mappings': {
+            'jee': 'photograph',
+            'neet': 'passport_photograph',
+            'upsc': 'photograph',
+            'gate': 'photograph',
+            'cat': 'photograph'
         }
-        
-        # Education level patterns for better classification
-        self.education_patterns = {
-            '10th': {
-                'keywords': ['10th', 'tenth', 'class 10', 'x class', 'sslc', 'matriculation'],
-                'patterns': [
-                    r'10th?',
-                    r'tenth',
-                    r'class\s*10',
-                    r'x\s*class',
-                    r'sslc',
-                    r'matriculation'
-                ]
-            },
-            '12th': {
-                'keywords': ['12th', 'twelfth', 'class 12', 'xii class', 'intermediate', 'higher secondary'],
-                'patterns': [
-                    r'12th?',
-                    r'twelfth',
-                    r'class\s*12',
-                    r'xii\s*class',
-                    r'intermediate',
-                    r'higher\s*secondary'
-                ]
-            },
-            'graduation': {
-                'keywords': ['graduation', 'bachelor', 'b.tech', 'b.sc', 'b.com', 'b.a', 'undergraduate'],
-                'patterns': [
-                    r'graduation',
-                    r'bachelor',
-                    r'b\.?tech',
-                    r'b\.?sc',
-                    r'b\.?com',
-                    r'b\.?a',
-                    r'undergraduate'
-                ]
-            }
+    },
+    'postcard_photograph': {
+        'keywords': [
+            'postcard photo', 'postcard photograph', 'postcard size photo'
+        ],
+        'patterns': [
+            r'postcard\s*(?:photo|photograph)',
+            r'postcard\s*size'
+        ],
+        'exam_mappings': {
+            'neet': 'postcard_photograph'
+        }
+    },
+    'signature': {
+        'keywords': [
+            'signature', 'sign', 'autograph', 'signed', 'sig'
+        ],
+        'patterns': [
+            r'signature',
+            r'sign(?:ed)?',
+            r'autograph',
+            r'\bsig\b'
+        ],
+        'exam_mappings': {
+            'jee': 'signature',
+            'neet': 'signature',
+            'upsc': 'signature',
+            'gate': 'signature',
+            'cat': 'signature'
+        }
+    },
+    'class10_certificate': {
+        'keywords': [
+            'class 10', '10th', 'tenth', 'x class', 'sslc', 'matriculation',
+            'class10', 'class-10', '10 class'
+        ],
+        'patterns': [
+            r'class\s*10',
+            r'10th?',
+            r'tenth',
+            r'x\s*class',
+            r'sslc',
+            r'matriculation'
+        ],
+        'exam_mappings': {
+            'jee': 'class10_certificate',
+            'neet': 'class10_certificate'
+        }
+    },
+    'category_certificate': {
+        'keywords': [
+            'caste certificate', 'category certificate', 'reservation certificate',
+            'obc', 'sc', 'st', 'ews', 'minority', 'pwd', 'disability'
+        ],
+        'patterns': [
+            r'caste\s*certificate',
+            r'category\s*certificate',
+            r'reservation\s*certificate',
+            r'obc|sc|st|ews',
+            r'minority\s*certificate',
+            r'pwd|disability'
+        ],
+        'exam_mappings': {
+            'neet': 'category_certificate',
+            'gate': 'category_certificate'
+        }
+    },
+    'caste_or_pwd_certificate': {
+        'keywords': [
+            'caste certificate', 'pwd certificate', 'disability certificate',
+            'reservation certificate', 'category certificate'
+        ],
+        'patterns': [
+            r'caste\s*certificate',
+            r'pwd\s*certificate',
+            r'disability\s*certificate',
+            r'reservation\s*certificate'
+        ],
+        'exam_mappings': {
+            'jee': 'caste_or_pwd_certificate'
         }
+    },
+    'finger_thumb_impressions': {
+        'keywords': [
+            'finger impression', 'thumb impression', 'fingerprint',
+            'thumb print', 'finger print'
+        ],
+        'patterns': [
+            r'finger\s*(?:impression|print)',
+            r'thumb\s*(?:impression|print)',
+            r'fingerprint'
+        ],
+        'exam_mappings': {
+            'neet': 'finger_thumb_impressions'
+        }
+    },
+    'address_proof': {
+        'keywords': [
+            'address proof', 'address certificate', 'domicile',
+            'residence proof', 'residential certificate'
+        ],
+        'patterns': [
+            r'address\s*(?:proof|certificate)',
+            r'domicile',
+            r'residence\s*proof',
+            r'residential\s*certificate'
+        ],
+        'exam_mappings': {
+            'neet': 'address_proof'
+        }
+    },
+    'photo_id_proof': {
+        'keywords': [
+            'photo id', 'identity proof', 'id proof', 'aadhar', 'aadhaar',
+            'pan card', 'voter id', 'passport', 'driving license'
+        ],
+        'patterns': [
+            r'photo\s*id',
+            r'identity\s*proof',
+            r'id\s*proof',
+            r'aa?dh?aa?r',
+            r'pan\s*card',
+            r'voter\s*id',
+            r'passport',
+            r'driving\s*licen[cs]e'
+        ],
+        'exam_mappings': {
+            'upsc': 'photo_id_proof'
+        }
+    },
+    'certificates_academic_or_category': {
+        'keywords': [
+            'academic certificate', 'degree certificate', 'graduation certificate',
+            'category certificate', 'educational certificate'
+        ],
+        'patterns': [
+            r'academic\s*certificate',
+            r'degree\s*certificate',
+            r'graduation\s*certificate',
+            r'educational\s*certificate'
+        ],
+        'exam_mappings': {
+            'cat': 'certificates_academic_or_category'
+        }
+    }
+}
+
+# Education level patterns for better classification
+_EDUCATION_PATTERNS = {
+    '10th': {
+        'keywords': ['10th', 'tenth', 'class 10', 'x class', 'sslc', 'matriculation'],
+        'patterns': [
+            r'10th?',
+            r'tenth',
+            r'class\s*10',
+            r'x\s*class',
+            r'sslc',
+            r'matriculation'
+        ]
+    },
+    '12th': {
+        'keywords': ['12th', 'twelfth', 'class 12', 'xii class', 'intermediate', 'higher secondary'],
+        'patterns': [
+            r'12th?',
+            r'twelfth',
+            r'class\s*12',
+            r'xii\s*class',
+            r'intermediate',
+            r'higher\s*secondary'
+        ]
+    },
+    'graduation': {
+        'keywords': ['graduation', 'bachelor', 'b.tech', 'b.sc', 'b.com', 'b.a', 'undergraduate'],
+        'patterns': [
+            r'graduation',
+            r'bachelor',
+            r'b\.?tech',
+            r'b\.?sc',
+            r'b\.?com',
+            r'b\.?a',
+            r'undergraduate'
+        ]
+    }
+}
+
+class DocumentAnalyzer:
+    # Pattern tables are shared by every analyzer; the compiled tables below are built once per process
+    document_patterns = _DOCUMENT_PATTERNS
+    education_patterns = _EDUCATION_PATTERNS
+
+    def __init__(self):
+        # LRU of batch classifications, where upload folders often repeat names
+        self._classification_cache: OrderedDict = OrderedDict()
+        self._classification_cache_size = 1024
+
+    @classmethod
+    def _compile_tables(cls) -> None:
+        """
+        Build the flattened category tables and keyword automaton shared by all analyzers
+        """
+        # Flattened per-category tables (parallel arrays indexed by category position)
+        # and a single keyword automaton covering document and education keywords.
+        # Each unique keyword is inserted once with every (kind, category) it scores for.
+        cls._ac = KeywordAutomaton()
+        contributions: Dict[str, List[Tuple[str, int]]] = defaultdict(list)
+        cls._doc_type_names: List[str] = []
+        cls._doc_compiled_regex: List[Optional[re.Pattern]] = []
+        cls._doc_content_keywords: List[Tuple[str, ...]] = []
+        cls._doc_exam_map: List[List[Optional[str]]] = []
+        cls._doc_max_confidence: List[float] = []
+        # Keyword score vectors indexed by [has exam bonus][keyword count]
+        doc_table_size = max(len(config['keywords']) for config in cls.document_patterns.values()) + 1
+        cls._doc_keyword_scores = (
+            cls._score_table(0.0, 0.3, doc_table_size),
+            cls._score_table(0.1, 0.3, doc_table_size)
+        )
+        for index, (doc_type, config) in enumerate(cls.document_patterns.items()):
+            keywords = frozenset(keyword.lower() for keyword in config['keywords'])
+            # Content keywords keep their configured order so the content check exits on the first hit
+            content_keywords = tuple(dict.fromkeys(keyword.lower() for keyword in config['keywords']))
+            cls._doc_type_names.append(doc_type)
+            cls._doc_content_keywords.append(content_keywords)
+            literals, regex_patterns = cls._split_literal_patterns(config['patterns'])
+            cls._doc_compiled_regex.append(cls._compile_alternation(regex_patterns))
+            exam_mappings = config.get('exam_mappings', {})
+            cls._doc_exam_map.append([exam_mappings.get(exam.name.lower()) for exam in ExamType])
+            cls._doc_max_confidence.append(cls._doc_keyword_scores[bool(exam_mappings)][len(keywords)] + 0.4 + 0.2)
+            for keyword in keywords:
+                contributions[keyword].append(('doc', index))
+            for literal in literals:
+                contributions[literal].append(('doc_pattern', index))
+
+        cls._edu_level_names: List[str] = []
+        cls._edu_compiled_regex: List[Optional[re.Pattern]] = []
+        cls._edu_content_keywords: List[Tuple[str, ...]] = []
+        cls._edu_max_confidence: List[float] = []
+        edu_table_size = max(len(config['keywords']) for config in cls.education_patterns.values()) + 1
+        cls._edu_keyword_scores = cls._score_table(0.0, 0.4, edu_table_size)
+        for index, (edu_level, config) in enumerate(cls.education_patterns.items()):
+            keywords = frozenset(keyword.lower() for keyword in config['keywords'])
+            # Content keywords keep their configured order so the content check exits on the first hit
+            content_keywords = tuple(dict.fromkeys(keyword.lower() for keyword in config['keywords']))
+            cls._edu_level_names.append(edu_level)
+            cls._edu_content_keywords.append(content_keywords)
+            literals, regex_patterns = cls._split_literal_patterns(config['patterns'])
+            cls._edu_compiled_regex.append(cls._compile_alternation(regex_patterns))
+            cls._edu_max_confidence.append(cls._edu_keyword_scores[len(keywords)] + 0.5 + 0.3)
+            for keyword in keywords:
+                contributions[keyword].append(('edu', index))
+            for literal in literals:
+                contributions[literal].append(('edu_pattern', index))
+        for keyword, keyword_contributions in contributions.items():
+            cls._ac.add_word(keyword, (keyword, tuple(dict.fromkeys(keyword_contributions))))
+        cls._ac.make_automaton()
+
+    @staticmethod
+    def _score_table(start: float, weight: float, size: int) -> List[float]:
+        """
+        Running totals start, start + weight, ... added one weight at a time
+        """
+        scores = [start]
+        for _ in range(size - 1):
+            scores.append(scores[-1] + weight)
+        return scores
+
+    @staticmethod
+    def _split_literal_patterns(patterns: List[str]) -> Tuple[List[str], List[str]]:
+        """
+        Separate plain literal alternations (e.g. 'obc|sc|st|ews') from real regexes
+        """
+        literals = []
+        regex_patterns = []
+        for pattern in patterns:
+            parts = pattern.lower().split('|')
+            if all(part and not _REGEX_METACHARS.intersection(part) for part in parts):
+                literals.extend(parts)
+            else:
+                regex_patterns.append(pattern)
+        return literals, regex_patterns
+
+    @staticmethod
+    def _compile_alternation(patterns: List[str]) -> Optional[re.Pattern]:
+        """
+        Combine a category's patterns into a single case-insensitive regex
+        """
+        if not patterns:
+            return None
+        return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), re.IGNORECASE)
 
     def analyze_document(self, filename: str, exam_type: str = None, file_content: Optional[str] = None) -> Dict:
         """
         Analyze document with exam-specific context
         """
-        filename_lower = filename.lower()
+        classification = self._classify(filename.lower(), exam_type, file_content)
+        return self._build_result(filename, exam_type, classification)
+
+    def _classify(self, filename_lower: str, exam_type: str = None, file_content: Optional[str] = None, keyword_hits: Optional[Dict[Tuple[str, int], int]] = None) -> Tuple[str, float, str, str, float]:
+        """
+        Detect document type and education level for a lowercased filename
+        """
+        exam_int = _EXAM_TO_INT.get(exam_type) if exam_type else None
+        content_lower = file_content.lower() if file_content else None
+        if keyword_hits is None:
+            keyword_hits = self._scan_keywords(filename_lower)
         
         # Extract document type with exam context
-        doc_type, doc_confidence = self._detect_document_type(filename_lower, exam_type, file_content)
+        doc_type, doc_confidence, exam_specific_type = self._detect_document_type(filename_lower, keyword_hits, exam_int, content_lower)
         
         # Extract education level
-        edu_level, edu_confidence = self._detect_education_level(filename_lower, file_content)
+        edu_level, edu_confidence = self._detect_education_level(filename_lower, keyword_hits, content_lower)
+        
+        return doc_type, doc_confidence, exam_specific_type, edu_level, edu_confidence
+
+    def _build_result(self, filename: str, exam_type: str, classification: Tuple[str, float, str, str, float]) -> Dict:
+        """
+        Assemble the analysis result for a classified document
+        """
+        doc_type, doc_confidence, exam_specific_type, edu_level, edu_confidence = classification
         
         # Generate suggested name based on exam requirements
-        suggested_name = self._generate_exam_specific_name(doc_type, edu_level, filename, exam_type)
+        suggested_name = self._generate_exam_specific_name(doc_type, edu_level, filename, exam_type, exam_specific_type)
         
         # Calculate overall confidence
         overall_confidence = (doc_confidence + edu_confidence) / 2
@@ -241,81 +457,133 @@ class DocumentAnalyzer:
             'education_level': edu_level,
             'exam_type': exam_type,
             'confidence': round(overall_confidence, 2),
-            'detected_category': self._get_exam_specific_category(doc_type, exam_type),
+            'detected_category': exam_specific_type,
             'analysis_details': {
                 'document_type_confidence': doc_confidence,
                 'education_level_confidence': edu_confidence,
-                'exam_specific_mapping': self._get_exam_mapping(doc_type, exam_type)
+                'exam_specific_mapping': exam_specific_type
             }
         }
 
-    def _detect_document_type(self, filename: str, exam_type: str = None, content: Optional[str] = None) -> Tuple[str, float]:
+    def _scan_keywords(self, filename: str) -> Dict[Tuple[str, int], int]:
+        """
+        Count distinct keywords per (kind, category) in a single automaton sweep
+        """
+        return self._scan_keywords_batch([filename])[0]
+
+    def _scan_keywords_batch(self, filenames: List[str]) -> List[Dict[Tuple[str, int], int]]:
+        """
+        Count keyword hits for many filenames with one sweep over their joined text
         """
-        Detect document type with exam-specific context
+        starts = []
+        position = 0
+        for filename in filenames:
+            starts.append(position)
+            position += len(filename) + 1
+        joined = _FILENAME_SEPARATOR.join(filenames)
+        
+        matched = [set() for _ in filenames]
+        for end, payload in self._ac.iter(joined):
+            matched[bisect_right(starts, end) - 1].add(payload)
+        
+        keyword_hits_list = []
+        for filename, payloads in zip(filenames, matched):
+            keyword_hits = defaultdict(int)
+            for _, contributions in payloads:
+                for contribution in contributions:
+                    keyword_hits[contribution] += 1
+            
+            folded = filename.translate(_IGNORECASE_EXTRAS)
+            if folded != filename:
+                # Keep literal patterns as permissive as the case-insensitive regexes they replace
+                for _, (_, contributions) in self._ac.iter(folded):
+                    for kind, category in contributions:
+                        if kind.endswith('_pattern'):
+                            keyword_hits[(kind, category)] += 1
+            keyword_hits_list.append(keyword_hits)
+        return keyword_hits_list
+
+    def _detect_document_type(self, filename: str, keyword_hits: Dict[Tuple[str, int], int], exam_int: Optional[int] = None, content_lower: Optional[str] = None) -> Tuple[str, float, str]:
+        """
+        Detect document type with exam-specific context, returning its exam-specific mapping too
         """
         best_match = 'document'
+        best_index = -1
         best_confidence = 0.0
         
-        for doc_type, config in self.document_patterns.items():
-            confidence = 0.0
+        compiled_regex = self._doc_compiled_regex
+        exam_map = self._doc_exam_map
+        max_confidence = self._doc_max_confidence
+        keyword_scores = self._doc_keyword_scores
+        content_keywords = self._doc_content_keywords
+        content_weight = 0.2 if content_lower else 0.0
+        
+        for i, doc_type in enumerate(self._doc_type_names):
+            # Skip categories that cannot beat the current best
+            if max_confidence[i] <= best_confidence:
+                continue
             
-            # Check if this document type is relevant for the exam
-            if exam_type and exam_type in config.get('exam_mappings', {}):
-                confidence += 0.1  # Bonus for exam relevance
+            # Bonus for exam relevance, plus 0.3 per matched keyword
+            exam_relevant = exam_int is not None and exam_map[i][exam_int] is not None
+            confidence = keyword_scores[exam_relevant][keyword_hits.get(('doc', i), 0)]
             
-            # Check keywords
-            for keyword in config['keywords']:
-                if keyword.lower() in filename:
-                    confidence += 0.3
+            # The regex and content checks can add at most this much; bail out if it is not enough
+            if confidence + 0.4 + content_weight <= best_confidence:
+                continue
             
-            # Check regex patterns
-            for pattern in config['patterns']:
-                if re.search(pattern, filename, re.IGNORECASE):
-                    confidence += 0.4
-                    break
+            # Check regex patterns; literal-only patterns were already matched by the keyword sweep
+            regex = compiled_regex[i]
+            if ('doc_pattern', i) in keyword_hits or (regex is not None and regex.search(filename)):
+                confidence += 0.4
             
             # Analyze content if available
-            if content:
-                content_lower = content.lower()
-                for keyword in config['keywords']:
-                    if keyword.lower() in content_lower:
-                        confidence += 0.2
-                        break
+            if content_lower and any(keyword in content_lower for keyword in content_keywords[i]):
+                confidence += 0.2
             
             if confidence > best_confidence:
                 best_confidence = confidence
                 best_match = doc_type
+                best_index = i
         
-        return best_match, min(best_confidence, 1.0)
+        exam_specific_type = best_match
+        if exam_int is not None and best_index >= 0:
+            exam_specific_type = exam_map[best_index][exam_int] or best_match
+        
+        return best_match, min(best_confidence, 1.0), exam_specific_type
 
-    def _detect_education_level(self, filename: str, content: Optional[str] = None) -> Tuple[str, float]:
+    def _detect_education_level(self, filename: str, keyword_hits: Dict[Tuple[str, int], int], content_lower: Optional[str] = None) -> Tuple[str, float]:
         """
         Detect education level from filename and content
         """
         best_match = ''
         best_confidence = 0.0
         
-        for edu_level, config in self.education_patterns.items():
-            confidence = 0.0
+        compiled_regex = self._edu_compiled_regex
+        max_confidence = self._edu_max_confidence
+        keyword_scores = self._edu_keyword_scores
+        content_keywords = self._edu_content_keywords
+        content_weight = 0.3 if content_lower else 0.0
+        
+        for i, edu_level in enumerate(self._edu_level_names):
+            # Skip categories that cannot beat the current best
+            if max_confidence[i] <= best_confidence:
+                continue
+            
+            # 0.4 per matched keyword
+            confidence = keyword_scores[keyword_hits.get(('edu', i), 0)]
             
-            # Check keywords
-            for keyword in config['keywords']:
-                if keyword.lower() in filename:
-                    confidence += 0.4
+            # The regex and content checks can add at most this much; bail out if it is not enough
+            if confidence + 0.5 + content_weight <= best_confidence:
+                continue
             
-            # Check regex patterns
-            for pattern in config['patterns']:
-                if re.search(pattern, filename, re.IGNORECASE):
-                    confidence += 0.5
-                    break
+            # Check regex patterns; literal-only patterns were already matched by the keyword sweep
+            regex = compiled_regex[i]
+            if ('edu_pattern', i) in keyword_hits or (regex is not None and regex.search(filename)):
+                confidence += 0.5
             
             # Analyze content if available
-            if content:
-                content_lower = content.lower()
-                for keyword in config['keywords']:
-                    if keyword.lower() in content_lower:
-                        confidence += 0.3
-                        break
+            if content_lower and any(keyword in content_lower for keyword in content_keywords[i]):
+                confidence += 0.3
             
             if confidence > best_confidence:
                 best_confidence = confidence
@@ -323,14 +591,12 @@ class DocumentAnalyzer:
         
         return best_match, min(best_confidence, 1.0)
 
-    def _generate_exam_specific_name(self, doc_type: str, edu_level: str, original_name: str, exam_type: str = None) -> str:
+    def _generate_exam_specific_name(self, doc_type: str, edu_level: str, original_name: str, exam_type: str = None, exam_specific_type: str = None) -> str:
         """
         Generate exam-specific file name suggestions
         """
-        file_extension = original_name.split('.')[-1] if '.' in original_name else 'pdf'
-        
-        # Get exam-specific mapping
-        exam_specific_type = self._get_exam_mapping(doc_type, exam_type)
+        _, separator, extension = original_name.rpartition('.')
+        file_extension = extension if separator else 'pdf'
         
         if exam_specific_type:
             # Use exam-specific naming convention
@@ -368,49 +634,70 @@ class DocumentAnalyzer:
         
         return f"{base_name}.{file_extension}"
 
-    def _get_exam_mapping(self, doc_type: str, exam_type: str = None) -> str:
-        """
-        Get exam-specific document type mapping
-        """
-        if not exam_type or doc_type not in self.document_patterns:
-            return doc_type
-        
-        exam_mappings = self.document_patterns[doc_type].get('exam_mappings', {})
-        return exam_mappings.get(exam_type, doc_type)
-
-    def _get_exam_specific_category(self, doc_type: str, exam_type: str = None) -> str:
-        """
-        Get the exam-specific category for the document
-        """
-        return self._get_exam_mapping(doc_type, exam_type)
-
     def batch_analyze(self, files_info: List[Dict], exam_type: str = None) -> List[Dict]:
         """
         Analyze multiple documents in batch with exam context
         """
+        keys = [
+            (file_info.get('name', '').lower(), exam_type, file_info.get('content', None))
+            for file_info in files_info
+        ]
+        
+        # Reuse cached classifications and collect the distinct files still to classify
+        classifications = {}
+        pending = []
+        for key in dict.fromkeys(keys):
+            cached = self._classification_cache.get(key)
+            if cached is None:
+                pending.append(key)
+            else:
+                self._classification_cache.move_to_end(key)
+                classifications[key] = cached
+        
+        # One keyword sweep covers every pending filename
+        keyword_hits_list = self._scan_keywords_batch([key[0] for key in pending])
+        for key, keyword_hits in zip(pending, keyword_hits_list):
+            classification = self._classify(*key, keyword_hits)
+            classifications[key] = classification
+            self._classification_cache[key] = classification
+            if len(self._classification_cache) > self._classification_cache_size:
+                self._classification_cache.popitem(last=False)
+        
         results = []
-        for file_info in files_info:
-            filename = file_info.get('name', '')
-            content = file_info.get('content', None)
-            analysis = self.analyze_document(filename, exam_type, content)
-            results.append(analysis)
+        for file_info, key in zip(files_info, keys):
+            results.append(self._build_result(file_info.get('name', ''), exam_type, classifications[key]))
         
         return results
 
+DocumentAnalyzer._compile_tables()
+
 # Global analyzer instance
 analyzer = DocumentAnalyzer()
 
+def _dumps(obj: Any) -> str:
+    """
+    Serialize to a JSON string; orjson returns bytes, stdlib json returns str
+    """
+    serialized = _json.dumps(obj)
+    return serialized.decode() if isinstance(serialized, bytes) else serialized
+
+@functools.lru_cache(maxsize=512)
+def _analyze_json(filename: str, exam_type: Optional[str], content: Optional[str]) -> str:
+    """
+    Serialized analysis, cached since UI re-renders repeat the same queries
+    """
+    return _dumps(analyzer.analyze_document(filename, exam_type, content))
+
 def analyze_document_js(filename: str, exam_type: str = None, content: str = None) -> str:
     """
     JavaScript-callable function for document analysis
     """
-    result = analyzer.analyze_document(filename, exam_type, content)
-    return json.dumps(result)
+    return _analyze_json(filename, exam_type, content)
 
 def batch_analyze_js(files_json: str, exam_type: str = None) -> str:
     """
     JavaScript-callable function for batch analysis
     """
-    files_info = json.loads(files_json)
+    files_info = _json.loads(files_json)
     results = analyzer.batch_analyze(files_info, exam_type)
-    return json.dumps(results)
\ No newline at end of file
+    return _dumps(results)
\ No newline at end of file